@@ -1,19 +1,52 @@
 """Scrapes individual course pages for detailed information."""
 
+import asyncio
 import re
-import time
 import logging
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import lxml.html
+from lxml import etree
 
 logger = logging.getLogger(__name__)
 
-REQUEST_DELAY = 1.5  # seconds between requests
 MAX_RETRIES = 3
 TIMEOUT = 15
 
+# Adaptive rate limiting: start at a modest rate, halve on 429/503 and
+# creep back up while the server keeps answering 200s, instead of the old
+# fixed 1.5s sleep between requests.
+INITIAL_RATE = 5.0  # requests per second
+# Floor must stay >= 1.0: aiolimiter's acquire() raises ValueError if the
+# bucket capacity (max_rate) drops below the amount acquired per request.
+MIN_RATE = 1.0
+RATE_RECOVERY_EVERY = 20  # successes between upward rate nudges
 
-def scrape_course_page(course):
+_successes_since_nudge = 0
+
+_CLIENT_TIMEOUT = aiohttp.ClientTimeout(total=TIMEOUT)
+
+# One parser instance shared across pages: reuses internal buffers and
+# pins the encoding so lxml skips charset auto-detection (pages are UTF-8).
+_PARSER = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+
+# Matches AU entries like '48.1 (Fall)'; compiled once at import.
+_RE_AU = re.compile(r"([\d.]+)\s*\((\w[\w\s]*?)\)")
+
+# Compiled once at import. One walk collects every Drupal field div; items
+# are then found within that div only. The field__item predicate is a token
+# match so it doesn't also hit the 'field__items' wrapper div.
+_XP_FIELD_DIVS = etree.XPath(".//div[contains(@class, 'field--name-field-')]")
+_XP_FIELD_ITEMS = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '), ' field__item ')]"
+)
+_XP_PARAGRAPHS = etree.XPath(".//p")
+
+# Pulls the field-name suffix out of a class list like
+# 'field field--name-field-credit field--type-...'
+_RE_FIELD_NAME = re.compile(r"field--name-field-([\w-]+)")
+
+
+async def scrape_course_page(session, limiter, course):
     """Enrich a course dict with details from its individual page.
 
     Adds: credit_value, hours, description, prerequisites, corequisites,
@@ -22,23 +55,29 @@ def scrape_course_page(course):
     """
     url = course["url"]
 
-    resp = _fetch_with_retry(url)
-    if resp is None:
+    body = await _fetch_with_retry(session, limiter, url)
+    if body is None:
         course["scrape_error"] = f"Failed to fetch {url}"
         return course
 
-    soup = BeautifulSoup(resp.text, "lxml")
-
-    course["credit_value"] = _extract_field_text(soup, "field--name-field-credit")
-    course["hours"] = _extract_field_text(soup, "field--name-field-hours")
-    course["description"] = _extract_description(soup)
-    course["prerequisites"] = _extract_field_text(soup, "field--name-field-prerequisite", separator=" ")
-    course["corequisites"] = _extract_field_text(soup, "field--name-field-corequisite", separator=" ")
-    course["exclusions"] = _extract_field_text(soup, "field--name-field-exclusion", separator=" ")
+    try:
+        root = lxml.html.fromstring(body, parser=_PARSER)
+    except etree.ParserError as e:
+        # e.g. an empty 200 body — record the error and keep the run going
+        course["scrape_error"] = f"Unparseable response from {url}: {e}"
+        return course
+    fields = _collect_field_divs(root)
+
+    course["credit_value"] = _extract_field_text(fields, "credit")
+    course["hours"] = _extract_field_text(fields, "hours")
+    course["description"] = _extract_description(fields)
+    course["prerequisites"] = _extract_field_text(fields, "prerequisite", separator=" ")
+    course["corequisites"] = _extract_field_text(fields, "corequisite", separator=" ")
+    course["exclusions"] = _extract_field_text(fields, "exclusion", separator=" ")
     course["academic_units"] = _parse_academic_units(
-        _extract_field_text(soup, "field--name-field-totalaus")
+        _extract_field_text(fields, "totalaus")
     )
-    course["program_tags"] = _extract_program_tags(soup)
+    course["program_tags"] = _extract_program_tags(fields)
 
     # Try to parse credit_value as float
     if course["credit_value"]:
@@ -50,47 +89,95 @@ def scrape_course_page(course):
     return course
 
 
-def _fetch_with_retry(url):
-    """Fetch URL with retries and exponential backoff."""
+async def _fetch_with_retry(session, limiter, url):
+    """Fetch URL with retries, adaptive rate limiting, and backoff."""
+    global _successes_since_nudge
     for attempt in range(MAX_RETRIES):
         try:
-            resp = requests.get(url, timeout=TIMEOUT)
-            resp.raise_for_status()
-            return resp
-        except requests.RequestException as e:
+            async with limiter:
+                async with session.get(url, timeout=_CLIENT_TIMEOUT) as resp:
+                    if resp.status in (429, 503):
+                        # Server is throttling: honor Retry-After and halve the
+                        # rate. The header may also be an HTTP-date, so only
+                        # trust it when it's a plain seconds count.
+                        retry_after_hdr = resp.headers.get("Retry-After", "")
+                        retry_after = int(retry_after_hdr) if retry_after_hdr.isdigit() else 2
+                        new_rate = _set_rate(limiter, limiter.max_rate * 0.5)
+                        _successes_since_nudge = 0
+                        logger.warning(
+                            "Got %d for %s; sleeping %ds, rate now %.2f req/s",
+                            resp.status, url, retry_after, new_rate,
+                        )
+                        await asyncio.sleep(retry_after)
+                        continue
+                    resp.raise_for_status()
+                    # Return raw bytes; lxml handles encoding detection itself.
+                    body = await resp.read()
+            # Nudge the rate back up after a streak of clean responses
+            _successes_since_nudge += 1
+            if _successes_since_nudge >= RATE_RECOVERY_EVERY and limiter.max_rate < INITIAL_RATE:
+                _successes_since_nudge = 0
+                _set_rate(limiter, limiter.max_rate * 1.1)
+            return body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             wait = 2 ** attempt
             logger.warning("Attempt %d failed for %s: %s", attempt + 1, url, e)
             if attempt < MAX_RETRIES - 1:
-                time.sleep(wait)
+                await asyncio.sleep(wait)
     logger.error("All retries exhausted for %s", url)
     return None
 
 
-def _extract_field_text(soup, class_name, separator=""):
-    """Extract text from a Drupal field div by its class name."""
-    div = soup.find("div", class_=class_name)
-    if not div:
+def _set_rate(limiter, rate):
+    """Clamp and apply a new token-bucket rate (aiolimiter has no setter)."""
+    rate = max(MIN_RATE, min(rate, INITIAL_RATE))
+    limiter.max_rate = rate
+    limiter._rate_per_sec = rate / limiter.time_period
+    return rate
+
+
+def _collect_field_divs(root):
+    """Map field-name suffix (e.g. 'credit') -> its div, in one tree walk."""
+    fields = {}
+    for div in _XP_FIELD_DIVS(root):
+        match = _RE_FIELD_NAME.search(div.get("class", ""))
+        if match:
+            # Keep the first occurrence, matching document order
+            fields.setdefault(match.group(1), div)
+    return fields
+
+
+def _extract_field_text(fields, name, separator=""):
+    """Extract text from a collected Drupal field div by its name suffix."""
+    div = fields.get(name)
+    if div is None:
         return None
-    item = div.find("div", class_="field__item")
-    if not item:
+    items = _XP_FIELD_ITEMS(div)
+    if not items:
         return None
-    text = item.get_text(separator=separator, strip=True)
+    text = _node_text(items[0], separator)
     return text if text else None
 
 
-def _extract_description(soup):
+def _extract_description(fields):
     """Extract the course description text."""
-    div = soup.find("div", class_="field--name-field-desc")
-    if not div:
+    div = fields.get("desc")
+    if div is None:
         return None
-    item = div.find("div", class_="field__item")
-    if not item:
+    items = _XP_FIELD_ITEMS(div)
+    if not items:
         return None
+    item = items[0]
     # Get all paragraph text joined
-    paragraphs = item.find_all("p")
+    paragraphs = _XP_PARAGRAPHS(item)
     if paragraphs:
-        return "\n\n".join(p.get_text(strip=True) for p in paragraphs)
-    return item.get_text(strip=True) or None
+        return "\n\n".join(_node_text(p) for p in paragraphs)
+    return _node_text(item) or None
+
+
+def _node_text(node, separator=""):
+    """Join an element's text fragments, stripped, like get_text(strip=True)."""
+    return separator.join(t.strip() for t in node.itertext() if t.strip())
 
 
 def _parse_academic_units(text):
@@ -98,17 +185,18 @@ def _parse_academic_units(text):
     if not text:
         return None
     result = {}
-    for match in re.finditer(r"([\d.]+)\s*\((\w[\w\s]*?)\)", text):
+    for match in _RE_AU.finditer(text):
         value = float(match.group(1))
         label = match.group(2).strip().lower().replace(" ", "_")
         result[label] = value
     return result if result else None
 
 
-def _extract_program_tags(soup):
+def _extract_program_tags(fields):
     """Extract program tags as a list of strings."""
-    div = soup.find("div", class_="field--name-field-program-tags")
-    if not div:
+    div = fields.get("program-tags")
+    if div is None:
         return []
-    items = div.find_all("div", class_="field__item")
-    return [item.get_text(strip=True) for item in items if item.get_text(strip=True)]
+    # Materialize each item's text once, then filter empties
+    texts = (_node_text(item) for item in _XP_FIELD_ITEMS(div))
+    return [t for t in texts if t]
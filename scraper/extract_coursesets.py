@@ -6,11 +6,12 @@ This script parses bracketed groups in requirement fields and creates
 reusable course sets that can be referenced by ID.
 """
 
-import json
-import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+import orjson
+
 
 def find_matching_bracket(text: str, start: int) -> int:
     """Find the closing bracket matching the opening bracket at start position."""
@@ -50,53 +51,89 @@ def extract_coursesets_from_field(
     if not field_value:
         return field_value, {}
 
-    coursesets = {}
-    counter = 1
-    updated_value = field_value
-
-    # Keep extracting bracketed groups until none remain
-    # Process innermost brackets first by finding the last '[' before each ']'
-    while '[' in updated_value:
-        # Find the innermost bracketed group
-        # Strategy: find rightmost '[' that comes before the first ']'
-        first_close = updated_value.index(']')
-
-        # Find the last '[' before this ']'
-        start = -1
-        for i in range(first_close - 1, -1, -1):
-            if updated_value[i] == '[':
-                start = i
-                break
-
-        if start == -1:
-            # Malformed brackets - stop extraction
-            break
-
-        # Extract the content (without brackets)
-        content = updated_value[start + 1:first_close].strip()
+    # The scan depends only on the field text, so it is cached and shared
+    # across courses with identical requirement strings; only the set-ID
+    # substitution below is per-course.
+    groups, tail = _scan_brackets(field_value)
 
-        # Create a set ID
-        set_id = f"{course_code}_{field_type}{counter}"
-
-        # Store the course set
-        coursesets[set_id] = content
-
-        # Replace the bracketed group with the set ID
-        # Include the brackets in the replacement to maintain exact positions
-        updated_value = updated_value[:start] + set_id + updated_value[first_close + 1:]
+    coursesets = {}
+    set_ids = []
+    for pieces in groups:
+        set_id = f"{course_code}_{field_type}{len(set_ids) + 1}"
+        set_ids.append(set_id)
+        coursesets[set_id] = _join_pieces(pieces, set_ids).strip()
 
-        counter += 1
+    updated_value = _join_pieces(tail, set_ids)
 
     # NEW: After bracket extraction, create final course set for remaining content
     # This handles simple single courses, OR lists, AND lists, etc.
     if updated_value.strip():
-        set_id = f"{course_code}_{field_type}{counter}"
+        set_id = f"{course_code}_{field_type}{len(set_ids) + 1}"
         coursesets[set_id] = updated_value.strip()
         updated_value = set_id
 
     return updated_value, coursesets
 
 
+@lru_cache(maxsize=4096)
+def _scan_brackets(field_value: str) -> Tuple[tuple, tuple]:
+    """
+    Single left-to-right scan over a bracketed field.
+
+    Each nesting level accumulates its text pieces in its own list, so
+    nested groups are emitted innermost-first — O(N) with no rescans.
+
+    Returns:
+        Tuple of (groups, tail)
+        - groups: one tuple of pieces per bracket group, in emission order
+        - tail: pieces of the text left after removing bracket groups
+        A piece is either a literal string or an int index referencing an
+        earlier group (to be replaced by that group's set ID).
+    """
+    groups = []
+    stack = []       # pending outer levels' piece lists
+    pieces = []      # pieces at the current nesting level
+    seg_start = 0    # start of the text segment not yet copied into pieces
+    for i, ch in enumerate(field_value):
+        if ch == '[':
+            pieces.append(field_value[seg_start:i])
+            stack.append(pieces)
+            pieces = []
+            seg_start = i + 1
+        elif ch == ']':
+            if not stack:
+                # Unmatched ']' — leave it in the text
+                continue
+            pieces.append(field_value[seg_start:i])
+            groups.append(tuple(pieces))
+            pieces = stack.pop()
+            pieces.append(len(groups) - 1)
+            seg_start = i + 1
+
+    pieces.append(field_value[seg_start:])
+    while stack:
+        # Unmatched '[' — restore the bracket literally
+        outer = stack.pop()
+        outer.append('[')
+        outer.extend(pieces)
+        pieces = outer
+
+    return tuple(groups), tuple(pieces)
+
+
+def _join_pieces(pieces: tuple, set_ids: List[str]) -> str:
+    """Join scan pieces, resolving int references to their set IDs."""
+    return ''.join(p if isinstance(p, str) else set_ids[p] for p in pieces)
+
+
+# Requirement fields and their set-ID type letters
+_FIELD_TYPES = (
+    ('prerequisites', 'p'),
+    ('corequisites', 'c'),
+    ('exclusions', 'e'),
+)
+
+
 def extract_all_coursesets(courses: List[Dict]) -> Tuple[List[Dict], Dict[str, Dict[str, str]]]:
     """
     Extract all course sets from all courses.
@@ -109,50 +146,28 @@ def extract_all_coursesets(courses: List[Dict]) -> Tuple[List[Dict], Dict[str, D
         - updated_courses: Courses with updated requirement fields
         - all_coursesets: Dictionary mapping set_id -> {"courses": "..."}
     """
-    all_coursesets = {}
+    formatted_coursesets = {}
     updated_courses = []
 
     for course in courses:
         course_code = course['code']
-        updated_course = course.copy()
-
-        # Process prerequisites
-        if course.get('prerequisites'):
-            updated_prereq, prereq_sets = extract_coursesets_from_field(
-                course_code,
-                course['prerequisites'],
-                'p'
-            )
-            updated_course['prerequisites'] = updated_prereq
-            all_coursesets.update(prereq_sets)
-
-        # Process corequisites
-        if course.get('corequisites'):
-            updated_coreq, coreq_sets = extract_coursesets_from_field(
-                course_code,
-                course['corequisites'],
-                'c'
-            )
-            updated_course['corequisites'] = updated_coreq
-            all_coursesets.update(coreq_sets)
-
-        # Process exclusions
-        if course.get('exclusions'):
-            updated_excl, excl_sets = extract_coursesets_from_field(
-                course_code,
-                course['exclusions'],
-                'e'
-            )
-            updated_course['exclusions'] = updated_excl
-            all_coursesets.update(excl_sets)
-
-        updated_courses.append(updated_course)
-
-    # Convert coursesets to the required format: {set_id: {"courses": "..."}}
-    formatted_coursesets = {
-        set_id: {"courses": courses_str}
-        for set_id, courses_str in all_coursesets.items()
-    }
+        new_fields = {}
+
+        for field, field_type in _FIELD_TYPES:
+            if course.get(field):
+                updated_field, field_sets = extract_coursesets_from_field(
+                    course_code,
+                    course[field],
+                    field_type
+                )
+                new_fields[field] = updated_field
+                # Write into the final {set_id: {"courses": ...}} format
+                # directly so there's no second pass over all sets at the end
+                for set_id, courses_str in field_sets.items():
+                    formatted_coursesets[set_id] = {"courses": courses_str}
+
+        # Only copy the dict when a field actually changed
+        updated_courses.append({**course, **new_fields} if new_fields else course)
 
     return updated_courses, formatted_coursesets
 
@@ -166,9 +181,9 @@ def main():
 
     print(f"Loading course database from: {db_path}")
 
-    # Load the current database
-    with open(db_path, 'r', encoding='utf-8') as f:
-        db = json.load(f)
+    # Load the current database (orjson decodes bytes, so open in binary)
+    with open(db_path, 'rb') as f:
+        db = orjson.loads(f.read())
 
     # Extract course sets
     print("Extracting course sets...")
@@ -178,18 +193,26 @@ def main():
     db['courses'] = updated_courses
     db['coursesets'] = coursesets
 
-    # Write back to file
+    # Write back to file (orjson emits UTF-8 bytes; indent kept for diffability)
     print(f"Writing updated database with {len(coursesets)} course sets...")
-    with open(db_path, 'w', encoding='utf-8') as f:
-        json.dump(db, f, indent=2, ensure_ascii=False)
+    with open(db_path, 'wb') as f:
+        f.write(orjson.dumps(db, option=orjson.OPT_INDENT_2))
 
     print(f"✓ Successfully extracted {len(coursesets)} course sets")
     print(f"✓ Updated {len(updated_courses)} courses")
 
-    # Print some statistics
-    prereq_sets = sum(1 for k in coursesets if '_p' in k)
-    coreq_sets = sum(1 for k in coursesets if '_c' in k)
-    excl_sets = sum(1 for k in coursesets if '_e' in k)
+    # Print some statistics — single pass, keyed on the type letter of the
+    # '_p1'/'_c2'/'_e1' suffix (a '_p' substring test would also match
+    # course codes containing '_p')
+    prereq_sets = coreq_sets = excl_sets = 0
+    for set_id in coursesets:
+        type_letter = set_id.rsplit('_', 1)[-1][0]
+        if type_letter == 'p':
+            prereq_sets += 1
+        elif type_letter == 'c':
+            coreq_sets += 1
+        elif type_letter == 'e':
+            excl_sets += 1
 
     print(f"\nBreakdown:")
     print(f"  - Prerequisite sets: {prereq_sets}")
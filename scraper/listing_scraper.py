@@ -1,12 +1,42 @@
 """Scrapes the main ECE listing page for course tables, groups, and semesters."""
 
 import re
+from functools import lru_cache
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+import lxml.html
+from lxml import etree
 
 BASE_URL = "https://engineering.calendar.utoronto.ca"
 LISTING_URL = f"{BASE_URL}/section/Electrical-and-Computer-Engineering"
 
+# Shared session so keep-alive reuses the TCP+TLS connection across fetches
+# against the same host instead of re-handshaking per request.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+_SESSION.headers.update({
+    "User-Agent": "CourseSelectionTool-scraper/1.0",
+    "Accept-Encoding": "gzip, deflate, br",
+})
+
+# Shared parser: pins encoding so lxml skips charset auto-detection.
+_PARSER = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+
+# Regexes compiled once at import time; these run inside per-row loops.
+_RE_WS = re.compile(r"\s+")
+_RE_GROUP = re.compile(r"Group\s+[A-Z]", re.IGNORECASE)
+_RE_COURSE = re.compile(r"([A-Z]{2,4}\d{3}[HY]\d)\s*:\s*(.+)")
+_RE_DEPT = re.compile(r"([A-Z]+)")
+_RE_SECTION = re.compile(r"(fall|winter|required)\s+(session|term|course)")
+
+# XPaths compiled once at import time.
+_XP_TABLES = etree.XPath("//table")
+_XP_ROWS = etree.XPath(".//tr")
+_XP_HEADER_CELL = etree.XPath("./td | ./th")
+_XP_CELLS = etree.XPath("./td")
+_XP_LINK = etree.XPath(".//a")
+
 
 def scrape_listing_page():
     """Fetch the listing page and extract all course entries from tables.
@@ -15,34 +45,39 @@ def scrape_listing_page():
         code, title, url, department, session, group, section, subcategory,
         lecture, lab, tutorial, weight
     """
-    resp = requests.get(LISTING_URL, timeout=15)
+    resp = _SESSION.get(LISTING_URL, timeout=15)
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "lxml")
+    root = lxml.html.fromstring(resp.content, parser=_PARSER)
 
     courses = []
     seen = set()  # (code, session) to deduplicate across CE/EE programs
 
-    tables = soup.find_all("table")
-    for table in tables:
-        rows = table.find_all("tr")
+    # One pass over the document maps each table to its preceding group label
+    group_map = _build_group_map(root)
+
+    for table in _XP_TABLES(root):
+        rows = _XP_ROWS(table)
         if len(rows) < 2:
             continue
 
-        # Determine group from previous sibling <p> (e.g. "Group A Courses")
-        group = _find_group_label(table)
+        # Group label preceding this table (e.g. "Group A Courses")
+        group = group_map.get(table)
 
         # The first row header tells us the section (e.g. "Fall Session – Year 1")
-        header_cell = rows[0].find(["td", "th"])
-        section = header_cell.get_text(strip=True) if header_cell else None
+        header_cells = _XP_HEADER_CELL(rows[0])
+        section = _cell_text(header_cells[0]) if header_cells else None
 
         subcategory = None  # KERNEL COURSES, TECHNICAL ELECTIVES, etc.
 
         for row in rows[1:]:
-            cells = row.find_all("td")
+            cells = _XP_CELLS(row)
             if len(cells) < 6:
                 continue
 
-            first_text = cells[0].get_text(strip=True)
+            # Read all six cell texts up front — one C-level text_content()
+            # walk per cell instead of scattered per-field extractions
+            texts = [cell.text_content().strip() for cell in cells[:6]]
+            first_text = texts[0]
 
             # Check for mid-table section break (e.g. "Winter Term – Year 3 or 4")
             if _is_section_header(first_text):
@@ -56,64 +91,73 @@ def scrape_listing_page():
                 continue
 
             # Otherwise it should be a course row
-            link = cells[0].find("a")
-            if not link:
+            links = _XP_LINK(cells[0])
+            if not links:
                 continue
+            link = links[0]
 
-            code, title = _parse_course_link(link)
+            code, title = _parse_course_link(link, first_text)
             if not code:
                 continue
 
-            session_val = cells[1].get_text(strip=True)
+            session_val = texts[1]
             key = (code, session_val)
             if key in seen:
                 continue
             seen.add(key)
 
-            href = link["href"]
+            href = link.get("href", "")
             url = href if href.startswith("http") else f"{BASE_URL}{href}"
 
             courses.append({
                 "code": code,
                 "title": title,
                 "url": url,
-                "department": re.match(r"([A-Z]+)", code).group(1),
+                "department": _RE_DEPT.match(code).group(1),
                 "session": session_val,
                 "group": group,
                 "section": _normalize_whitespace(section) if section else None,
                 "subcategory": subcategory,
-                "lecture": _parse_hours(cells[2]),
-                "lab": _parse_hours(cells[3]),
-                "tutorial": _parse_hours(cells[4]),
-                "weight": _parse_hours(cells[5]),
+                "lecture": _parse_hours(texts[2]),
+                "lab": _parse_hours(texts[3]),
+                "tutorial": _parse_hours(texts[4]),
+                "weight": _parse_hours(texts[5]),
             })
 
     return courses
 
 
-def _find_group_label(table):
-    """Walk previous siblings to find a group label like 'Group A Courses'."""
-    node = table.find_previous_sibling()
-    # Look back a few siblings (sometimes there are whitespace nodes)
-    for _ in range(5):
-        if node is None:
-            break
-        text = node.get_text(strip=True)
-        if re.search(r"Group\s+[A-Z]", text, re.IGNORECASE):
-            return text
-        if "SCIENCE/MATH ELECTIVES" in text.upper():
-            return text
-        # Stop searching if we hit another table or heading
-        if node.name in ("table", "h2"):
-            break
-        node = node.find_previous_sibling()
-    return None
+# Tags a group label can live in (labels sit in a <p> or similar, never a
+# wrapper div, which would match on its whole subtree's text)
+_GROUP_LABEL_TAGS = ("p", "h3", "h4", "strong")
+
+
+def _build_group_map(root):
+    """Map each table to the group label preceding it, in one document scan.
+
+    Tracks the last label seen (e.g. 'Group A Courses'); a table consumes it
+    and headings clear it, so labels never carry past an intervening table
+    or <h2> — same scoping as the old previous-sibling walk.
+    """
+    group_map = {}
+    current = None
+    for el in root.iter("table", "h2", *_GROUP_LABEL_TAGS):
+        if el.tag == "table":
+            group_map[el] = current
+            current = None
+        elif el.tag == "h2":
+            current = None
+        else:
+            text = _cell_text(el)
+            if _RE_GROUP.search(text) or "SCIENCE/MATH ELECTIVES" in text.upper():
+                current = text
+    return group_map
 
 
 def _is_section_header(text):
     """Check if a row's first cell is a section header like 'Winter Term – Year 3 or 4'."""
     normalized = _normalize_whitespace(text).lower()
-    return bool(re.search(r"(fall|winter|required)\s+(session|term|course)", normalized))
+    return bool(_RE_SECTION.search(normalized))
 
 
 def _is_subcategory(text):
@@ -125,20 +169,17 @@ def _is_subcategory(text):
     ) or "KERNEL" in normalized or "ELECTIVE" in normalized
 
 
-def _parse_course_link(link_tag):
-    """Extract (code, title) from a link like 'ECE302H1: Probability and Applications'."""
-    text = link_tag.get_text(strip=True)
-    # The link text is just the code; the title follows after ": " in the parent cell
-    full_text = link_tag.parent.get_text(strip=True)
-    match = re.match(r"([A-Z]{2,4}\d{3}[HY]\d)\s*:\s*(.+)", full_text)
+def _parse_course_link(link_tag, cell_text):
+    """Extract (code, title) from cell text like 'ECE302H1: Probability and Applications'."""
+    # The link text is just the code; the title follows after ": " in the cell
+    match = _RE_COURSE.match(_normalize_whitespace(cell_text))
     if match:
         return match.group(1), match.group(2)
-    return text, ""
+    return _cell_text(link_tag), ""
 
 
-def _parse_hours(cell):
+def _parse_hours(text):
     """Parse a numeric cell value, returning float or None for '-'."""
-    text = cell.get_text(strip=True)
     if text == "-" or text == "":
         return None
     try:
@@ -147,6 +188,16 @@ def _parse_hours(cell):
         return None
 
 
+def _cell_text(node):
+    """Join an element's text fragments, stripped, like get_text(strip=True)."""
+    return "".join(t.strip() for t in node.itertext() if t.strip())
+
+
+@lru_cache(maxsize=512)
 def _normalize_whitespace(text):
-    """Replace non-breaking spaces and multiple spaces with single space."""
-    return re.sub(r"\s+", " ", text.replace("\xa0", " ")).strip()
+    """Replace non-breaking spaces and multiple spaces with single space.
+
+    Cached: section headers and subcategory labels repeat across tables,
+    so the input domain is small and bounded.
+    """
+    return _RE_WS.sub(" ", text.replace("\xa0", " ")).strip()
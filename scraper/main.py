@@ -4,18 +4,26 @@ Usage:
     python scraper/main.py
 """
 
-import json
+import asyncio
 import logging
-import time
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
+import aiohttp
+import orjson
+from aiolimiter import AsyncLimiter
+
 from scraper.listing_scraper import scrape_listing_page
-from scraper.course_scraper import scrape_course_page, REQUEST_DELAY
+from scraper.course_scraper import scrape_course_page, INITIAL_RATE
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 OUTPUT_PATH = PROJECT_ROOT / "data" / "course_db.json"
 
+MAX_CONCURRENCY = 8  # in-flight course page fetches
+POOL_LIMIT = 10  # TCP connections kept open to the host
+LOG_EVERY = 25  # progress log interval (per-course lines serialize workers)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -24,6 +32,38 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _bounded_scrape(sem, limiter, session, course, done, total):
+    async with sem:
+        # The limiter is acquired per attempt inside the fetch, so retries
+        # and 429/503 backoff are rate-limited too
+        await scrape_course_page(session, limiter, course)
+    # Single event loop, so the counter needs no locking
+    done[0] += 1
+    if course.get("scrape_error"):
+        logger.warning("  [%d/%d] Error on %s: %s", done[0], total, course["code"], course["scrape_error"])
+    elif done[0] % LOG_EVERY == 0 or done[0] == total:
+        logger.info("  [%d/%d] latest=%s", done[0], total, course["code"])
+
+
+async def _scrape_all_course_pages(courses):
+    """Fetch all course pages concurrently, rate-limited for politeness."""
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = AsyncLimiter(INITIAL_RATE, 1)
+    connector = aiohttp.TCPConnector(limit=POOL_LIMIT)
+    headers = {
+        "User-Agent": "CourseSelectionTool-scraper/1.0",
+        # br requires the Brotli package for decoding; HTML compresses ~5-10x
+        "Accept-Encoding": "gzip, deflate, br",
+    }
+    done = [0]
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        tasks = [
+            asyncio.create_task(_bounded_scrape(sem, limiter, session, course, done, len(courses)))
+            for course in courses
+        ]
+        await asyncio.gather(*tasks)
+
+
 def main():
     logger.info("Starting UofT ECE course scraper")
 
@@ -32,24 +72,16 @@ def main():
     courses = scrape_listing_page()
     logger.info("Found %d course entries on listing page", len(courses))
 
-    # Phase 2: individual course pages
-    logger.info("Scraping individual course pages (%.0fs estimated)...", len(courses) * REQUEST_DELAY)
-    success = 0
-    fail = 0
-    for i, course in enumerate(courses):
-        logger.info("  [%d/%d] %s", i + 1, len(courses), course["code"])
-        scrape_course_page(course)
-        if course.get("scrape_error"):
-            fail += 1
-            logger.warning("    Error: %s", course["scrape_error"])
-        else:
-            success += 1
-        if i < len(courses) - 1:
-            time.sleep(REQUEST_DELAY)
+    # Phase 2: individual course pages (concurrent)
+    logger.info("Scraping %d individual course pages...", len(courses))
+    asyncio.run(_scrape_all_course_pages(courses))
+    fail = sum(1 for c in courses if c.get("scrape_error"))
+    success = len(courses) - fail
 
     # Phase 3: write output
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+    courses.sort(key=itemgetter("code"))
     data = {
         "metadata": {
             "scraped_at": datetime.now(timezone.utc).isoformat(),
@@ -58,11 +90,12 @@ def main():
             "successful": success,
             "failed": fail,
         },
-        "courses": sorted(courses, key=lambda c: c["code"]),
+        "courses": courses,
     }
 
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly; indent kept so the DB stays diffable.
+    with open(OUTPUT_PATH, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     logger.info("Wrote %d courses to %s", len(courses), OUTPUT_PATH)
     logger.info("Done — %d succeeded, %d failed", success, fail)
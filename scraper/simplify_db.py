@@ -2,10 +2,12 @@
 Simplifies course_db_full.json by merging duplicate courses and keeping only essential fields.
 """
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 from collections import defaultdict
+from operator import itemgetter
+
+import orjson
 
 # Define the project root and file paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -26,9 +28,18 @@ KEEP_FIELDS = [
 ]
 
 
+# C-level tuple projection; faster than a per-field dict comprehension
+_KEEP = tuple(KEEP_FIELDS)
+_GET = itemgetter(*_KEEP)
+
+
 def simplify_course(course):
     """Extract only the fields we want to keep."""
-    return {field: course.get(field) for field in KEEP_FIELDS}
+    try:
+        return dict(zip(_KEEP, _GET(course)))
+    except KeyError:
+        # Rare: a course missing one of the kept fields
+        return {field: course.get(field) for field in _KEEP}
 
 
 def merge_courses(courses):
@@ -44,14 +55,16 @@ def merge_courses(courses):
     merged = []
     merge_count = 0
 
-    for code, course_list in sorted(by_code.items()):
+    # Iterate in insertion order and sort once at the end — sorting the
+    # shorter deduped list beats sorting the grouping dict's items.
+    for code, course_list in by_code.items():
         if len(course_list) == 1:
             # Single entry, keep as-is
             merged.append(simplify_course(course_list[0]))
         elif len(course_list) == 2:
-            # Check if we have F and S sessions
-            sessions = {c["session"] for c in course_list}
-            if sessions == {"F", "S"}:
+            # Check if we have F and S sessions (avoid a set allocation)
+            sessions = (course_list[0]["session"], course_list[1]["session"])
+            if sessions == ("F", "S") or sessions == ("S", "F"):
                 # Merge into session B
                 base_course = course_list[0].copy()
                 base_course["session"] = "B"
@@ -69,15 +82,16 @@ def merge_courses(courses):
             for course in course_list:
                 merged.append(simplify_course(course))
 
+    merged.sort(key=itemgetter("code"))
     return merged, merge_count
 
 
 def main():
     print(f"Reading from {INPUT_FILE}...")
 
-    # Load the full database
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Load the full database (orjson decodes bytes, so open in binary)
+    with open(INPUT_FILE, "rb") as f:
+        data = orjson.loads(f.read())
 
     original_count = len(data["courses"])
     print(f"Original course count: {original_count}")
@@ -99,10 +113,10 @@ def main():
         "courses": simplified_courses,
     }
 
-    # Write to output file
+    # Write to output file (orjson emits UTF-8 bytes; indent kept for diffability)
     print(f"Writing to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with open(OUTPUT_FILE, "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
     print("Done!")
 